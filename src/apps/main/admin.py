@@ -4,6 +4,28 @@ from django.utils.html import format_html
 from . import models
 
 
+def image_preview(image, thumb):
+    # Превью берём из уменьшенной копии, пока её нет - из оригинала
+    if image:
+        return format_html('<img src="{}" style="max-height:60px;"/>', (thumb or image).url)  # noqa
+    return "—"
+
+
+class ChangeListDeferMixin:
+    # Тяжёлые поля, которые не нужны в списке объектов;
+    # на странице редактирования объект загружается целиком
+    list_defer = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        opts = self.model._meta
+        changelist = f"{opts.app_label}_{opts.model_name}_changelist"
+        match = request.resolver_match
+        if self.list_defer and match and match.url_name == changelist:
+            queryset = queryset.defer(*self.list_defer)
+        return queryset
+
+
 @admin.register(models.SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
     fieldsets = (
@@ -36,15 +58,11 @@ class SiteSettingsAdmin(admin.ModelAdmin):
         return super().has_add_permission(request)
 
     def logo_preview(self, obj):
-        if obj.logo:
-            return format_html('<img src="{}" style="max-height:60px;"/>', obj.logo.url)  # noqa
-        return "—"
+        return image_preview(obj.logo, obj.logo_admin_thumb)
     logo_preview.short_description = "Логотип (превью)"
 
     def tursab_preview(self, obj):
-        if obj.tursab_image:
-            return format_html('<img src="{}" style="max-height:60px;"/>', obj.tursab_image.url)  # noqa
-        return "—"
+        return image_preview(obj.tursab_image, obj.tursab_image_admin_thumb)
     tursab_preview.short_description = "Турсаб (превью)"
 
 
@@ -54,15 +72,17 @@ class ExcursionImageInline(admin.TabularInline):
     fields = ("image", "caption", "sort_order", "thumb")
     readonly_fields = ("thumb",)
 
+    def get_queryset(self, request):
+        # __str__ изображения обращается к экскурсии
+        return super().get_queryset(request).select_related("excursion")
+
     def thumb(self, obj):
-        if obj.image:
-            return format_html('<img src="{}" style="max-height:60px;"/>', obj.image.url)  # noqa
-        return "—"
+        return image_preview(obj.image, obj.image_admin_thumb)
     thumb.short_description = "Превью"
 
 
 @admin.register(models.Excursion)
-class ExcursionAdmin(admin.ModelAdmin):
+class ExcursionAdmin(ChangeListDeferMixin, admin.ModelAdmin):
     fieldsets = (
         (None, {"fields": ("title", "slug", "is_published")}),
         ("Контент", {"fields": ("short_description", "content_md")}),
@@ -71,35 +91,31 @@ class ExcursionAdmin(admin.ModelAdmin):
     inlines = (ExcursionImageInline,)
     list_display = ("title", "is_published", "created_at", "updated_at", "cover_thumb")  # noqa
     list_filter = ("is_published", "created_at")
+    list_defer = ("short_description", "content_md")
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ("cover_thumb", "cover_head_thumb")
     search_fields = ("title", "short_description", "content_md")
 
     def cover_thumb(self, obj):
-        if obj.cover:
-            return format_html('<img src="{}" style="max-height:60px;"/>', obj.cover.url)  # noqa
-        return "—"
+        return image_preview(obj.cover, obj.cover_admin_thumb)
 
     def cover_head_thumb(self, obj):
-        if obj.cover_head:
-            return format_html('<img src="{}" style="max-height:60px;"/>', obj.cover_head.url)  # noqa
-        return "—"
+        return image_preview(obj.cover_head, obj.cover_head_admin_thumb)
 
     cover_thumb.short_description = "Превью"
 
 
 @admin.register(models.Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(ChangeListDeferMixin, admin.ModelAdmin):
     list_display = ("full_name", "is_published", "created_at", "photo_thumb")
     list_filter = ("is_published", "created_at")
+    list_defer = ("text",)
     search_fields = ("full_name", "text")
     readonly_fields = ("photo_thumb",)
     fields = ("full_name", "text", "is_published", "photo", "photo_thumb")
 
     def photo_thumb(self, obj):
-        if obj.photo:
-            return format_html('<img src="{}" style="max-height:60px;"/>', obj.photo.url)  # noqa
-        return "—"
+        return image_preview(obj.photo, obj.photo_admin_thumb)
     photo_thumb.short_description = "Превью"
 
 
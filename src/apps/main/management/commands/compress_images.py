@@ -0,0 +1,64 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ... import tasks
+from ...models import ImageCompressionMixin
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт недостающие производные изображения (WebP-копии, превью "
+        "для админки) для уже сохранённых объектов. Подхватывает и задачи "
+        "сжатия, потерянные при перезапуске процесса"
+    )
+
+    def handle(self, *args, **options):
+        for model in apps.get_app_config("main").get_models():
+            if not issubclass(model, ImageCompressionMixin):
+                continue
+
+            pending = self._get_pending(model)
+            failed = 0
+            for pk, field_names in pending.items():
+                try:
+                    tasks.compress_model_images(
+                        model._meta.app_label,
+                        model._meta.model_name,
+                        pk,
+                        sorted(field_names)
+                    )
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(
+                        f"{model._meta.label} #{pk}: {error}"
+                    )
+
+            self.stdout.write(
+                f"{model._meta.label}: обработано {len(pending) - failed}, "
+                f"ошибок {failed}"
+            )
+
+    def _get_pending(self, model):
+        # {pk: {поля}} - объекты, у которых исходное изображение есть,
+        # а хотя бы одного производного нет
+        pending = {}
+        for field_name, config in model.image_compression_config.items():
+            for key in model.variant_config_keys:
+                variant = config.get(key)
+                if not variant:
+                    continue
+
+                missing = (
+                    Q(**{variant: ""})
+                    | Q(**{f"{variant}__isnull": True})
+                )
+                queryset = (
+                    model.objects
+                    .exclude(**{field_name: ""})
+                    .exclude(**{f"{field_name}__isnull": True})
+                    .filter(missing)
+                )
+                for pk in queryset.values_list("pk", flat=True):
+                    pending.setdefault(pk, set()).add(field_name)
+        return pending
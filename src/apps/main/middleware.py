@@ -0,0 +1,27 @@
+from django.utils.functional import SimpleLazyObject
+
+import functools
+
+from . import models
+
+
+class SiteContextMiddleware:
+    """
+    Добавляет в запрос настройки сайта и время последнего изменения
+    контента: они загружаются лениво и не более одного раза, сколько
+    бы шаблонов и тегов их ни запросило
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.get_content_updated_at = functools.cache(
+            models.SiteSettings.get_last_modified
+        )
+        request.site_settings = SimpleLazyObject(
+            lambda: models.SiteSettings.get_cached(
+                models.get_cache_version(request.get_content_updated_at())
+            )
+        )
+        return self.get_response(request)
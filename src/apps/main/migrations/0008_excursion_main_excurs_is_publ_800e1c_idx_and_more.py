@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-14 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_sitesettings_banner_image_sitesettings_banner_link'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='excursion',
+            index=models.Index(fields=['is_published', '-created_at'], name='main_excurs_is_publ_800e1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['is_published', 'sort_order'], name='main_faq_is_publ_ab574e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_published', '-created_at'], name='main_review_is_publ_fc9164_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sociallink',
+            index=models.Index(fields=['is_active', 'sort_order'], name='main_social_is_acti_7d6b54_idx'),
+        ),
+    ]
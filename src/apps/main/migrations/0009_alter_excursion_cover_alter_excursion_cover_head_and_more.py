@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-14 05:10
+
+import apps.main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_excursion_main_excurs_is_publ_800e1c_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='excursion',
+            name='cover',
+            field=models.ImageField(blank=True, null=True, upload_to=apps.main.models.UploadTo('cover'), verbose_name='Изображение (обложка)'),
+        ),
+        migrations.AlterField(
+            model_name='excursion',
+            name='cover_head',
+            field=models.ImageField(blank=True, null=True, upload_to=apps.main.models.UploadTo('cover_head'), verbose_name='Шапка'),
+        ),
+        migrations.AlterField(
+            model_name='excursionimage',
+            name='image',
+            field=models.ImageField(upload_to=apps.main.models.UploadTo('image'), verbose_name='Изображение'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, upload_to=apps.main.models.UploadTo('photo'), verbose_name='Фото'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='banner_image',
+            field=models.ImageField(blank=True, null=True, upload_to=apps.main.models.UploadTo('banner_image'), verbose_name='Изображение баннера'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, upload_to=apps.main.models.UploadTo('logo'), verbose_name='Логотип'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='tursab_image',
+            field=models.ImageField(blank=True, null=True, upload_to=apps.main.models.UploadTo('tursab_image'), verbose_name='Изображение Турсаб'),
+        ),
+    ]
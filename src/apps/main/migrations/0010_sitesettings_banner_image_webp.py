@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-14 05:12
+
+import apps.main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_alter_excursion_cover_alter_excursion_cover_head_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='banner_image_webp',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('banner_image_webp'), verbose_name='Изображение баннера (WebP)'),
+        ),
+    ]
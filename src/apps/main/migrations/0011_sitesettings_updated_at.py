@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-14 05:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_sitesettings_banner_image_webp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Обновлено'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-14 05:17
+
+import apps.main.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_sitesettings_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='excursion',
+            name='cover_admin_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('cover_admin_thumb'), verbose_name='Обложка (превью)'),
+        ),
+        migrations.AddField(
+            model_name='excursion',
+            name='cover_head_admin_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('cover_head_admin_thumb'), verbose_name='Шапка (превью)'),
+        ),
+        migrations.AddField(
+            model_name='excursionimage',
+            name='image_admin_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('image_admin_thumb'), verbose_name='Изображение (превью)'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='photo_admin_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('photo_admin_thumb'), verbose_name='Фото (превью)'),
+        ),
+        migrations.AddField(
+            model_name='sitesettings',
+            name='logo_admin_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('logo_admin_thumb'), verbose_name='Логотип (превью)'),
+        ),
+        migrations.AddField(
+            model_name='sitesettings',
+            name='tursab_image_admin_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to=apps.main.models.UploadTo('tursab_image_admin_thumb'), verbose_name='Турсаб (превью)'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-14 06:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_excursion_cover_admin_thumb_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesettings',
+            name='content_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Контент обновлён'),
+        ),
+    ]
@@ -1,32 +1,59 @@
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db import models
+from django.db import models, transaction
+from django.utils.deconstruct import deconstructible
 from django.urls import reverse
+from django.utils import timezone
 
-from io import BytesIO
+import hashlib
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
 from PIL import Image
 
+from . import tasks
 
-def upload_to(instance, filename):
+
+SITE_SETTINGS_CACHE_KEY = "main:site_settings"
+SITE_SETTINGS_CACHE_TIMEOUT = 60 * 60
+
+EXCURSION_LIST_CACHE_KEY = "main:excursions"
+REVIEW_LIST_CACHE_KEY = "main:reviews"
+FAQ_LIST_CACHE_KEY = "main:faqs"
+LIST_CACHE_TIMEOUT = 60 * 5
+
+
+def get_cache_version(updated_at):
+    # Версия кэша – время последнего изменения из БД: без общего кэша
+    # cache.delete сбрасывает данные только в своём процессе, а с новой
+    # версией устаревшие записи перестают читаться во всех процессах
+    if updated_at is None:
+        return 0
+    return int(updated_at.timestamp() * 1_000_000)
+
+
+@deconstructible
+class UploadTo:
     """
     Формирует путь для загрузки файлов:
     <app>/<model>/<field>/<filename>
     Пример: core/excursion/cover/image.jpg
     """
-    app_label = instance._meta.app_label
-    model_name = instance.__class__.__name__.lower()
 
-    # Пытаемся определить имя поля, вызвавшего upload_to
-    field_name = None
-    for field in instance._meta.fields:
-        if getattr(field, "upload_to", None) == upload_to:
-            field_name = field.name
-            break
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+
+    def __call__(self, instance, filename):
+        app_label = instance._meta.app_label
+        model_name = instance.__class__.__name__.lower()
+
+        return f"{app_label}/{model_name}/{self.field_name}/{filename}"
 
-    field_name = field_name or "file"
 
-    return f"{app_label}/{model_name}/{field_name}/{filename}"
+def upload_to(field_name: str):
+    # Имя поля задаётся при объявлении, а не ищется перебором
+    # instance._meta.fields при каждой загрузке
+    return UploadTo(field_name)
 
 
 class ImageCompressionMixin:
@@ -34,64 +61,321 @@ class ImageCompressionMixin:
     default_max_width = 1280
     default_max_height = 1280
     default_quality = 70
+    # JPEG в пределах размеров и не тяжелее этого значения не пережимаем
+    default_max_file_size = 400 * 1024
+    # крупные результаты сжатия сбрасываются на диск, а не держатся в памяти
+    spool_max_size = 512 * 1024
+    # превью для админки
+    admin_thumb_size = (160, 160)
+    admin_thumb_quality = 70
 
     # формат:
     # image_compression_config = {
-    #   "field_name": {"max_width": 123, "max_height": 123, "quality": 80}
+    #   "field_name": {
+    #       "max_width": 123,
+    #       "max_height": 123,
+    #       "quality": 80,
+    #       "max_file_size": 1024,
+    #       "webp_field": "field_name_webp",
+    #       "admin_thumb_field": "field_name_admin_thumb",
+    #       "compress": True  # False - только варианты, оригинал не трогаем
+    #   }
     # }
     image_compression_config = {}
 
-    def _compress_image_field(self, field_name: str, config: dict):
-        field = getattr(self, field_name, None)
-
-        if not field:
-            return
-
-        img = Image.open(field)
-
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-
-        max_width = config.get("max_width", self.default_max_width)
-        max_height = config.get("max_height", self.default_max_height)
-        quality = config.get("quality", self.default_quality)
+    # поля с производными изображениями, которые устаревают
+    # вместе с исходным
+    variant_config_keys = ("webp_field", "admin_thumb_field")
+
+    def _save_jpeg(self, img, stream, quality: int):
+        # Pillow собран с libjpeg-turbo (SIMD), поэтому кодируем им;
+        # цветовая субдискретизация 4:2:0 задана явно. Второй проход
+        # оптимизации таблиц Хаффмана (optimize) не делаем: он заметно
+        # дороже по CPU, а выигрыш в размере файла невелик
+        img.save(
+            stream,
+            format="JPEG",
+            quality=quality,
+            optimize=False,
+            progressive=False,
+            subsampling=2
+        )
 
-        img.thumbnail((max_width, max_height))
+    def _save_webp(self, img, stream, quality: int):
+        img.save(stream, format="WEBP", quality=quality, method=6)
 
-        img_io = BytesIO()
-        img.save(img_io, format="JPEG", quality=quality, optimize=True)
+    def _to_rgb(self, img):
+        # Прозрачные области заливаем белым: convert("RGB")
+        # сделал бы их чёрными, что портит логотипы
+        has_alpha = img.mode in ("RGBA", "LA") or (
+            img.mode == "P" and "transparency" in img.info
+        )
+        if not has_alpha:
+            return img.convert("RGB")
+
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+
+    def _build_image_file(self, field_name, name, content_type, write):
+        img_io = SpooledTemporaryFile(max_size=self.spool_max_size, mode="w+b")
+        write(img_io)
+        size = img_io.tell()
         img_io.seek(0)
 
-        original_name = Path(field.name).stem
-        new_name = f"{original_name}.jpg"
-
-        compressed_file = InMemoryUploadedFile(
+        image_file = InMemoryUploadedFile(
             img_io,
             field_name=field_name,
-            name=new_name,
-            content_type="image/jpeg",
-            size=img_io.getbuffer().nbytes,
+            name=name,
+            content_type=content_type,
+            size=size,
             charset=None
         )
+        image_file._compressed = True
+        return image_file
+
+    def _get_source_digest(self, field):
+        # Один и тот же файл, загруженный в разные поля (например,
+        # обложка и шапка), узнаём по хэшу всего содержимого: начало
+        # JPEG с камеры почти целиком занято EXIF и встроенным превью
+        digest = hashlib.md5(usedforsecurity=False)
+        for chunk in field.chunks():
+            digest.update(chunk)
+        field.seek(0)
+        return digest.digest()
+
+    def _group_by_source(self, entries):
+        # Хэшируем только файлы одинакового размера: остальные заведомо
+        # разные, и лишнее чтение (а на удалённом хранилище – скачивание)
+        # не нужно. Единственное поле не группируем вовсе
+        if len(entries) < 2:
+            return [entries] if entries else []
+
+        by_size = {}
+        for entry in entries:
+            size = getattr(self, entry[0]).size
+            by_size.setdefault(size, []).append(entry)
+
+        groups = []
+        for same_size in by_size.values():
+            if len(same_size) == 1:
+                groups.append(same_size)
+                continue
+            by_digest = {}
+            for entry in same_size:
+                digest = self._get_source_digest(getattr(self, entry[0]))
+                by_digest.setdefault(digest, []).append(entry)
+            groups += by_digest.values()
+        return groups
+
+    def _get_bounds(self, config: dict):
+        return (
+            config.get("max_width", self.default_max_width),
+            config.get("max_height", self.default_max_height)
+        )
 
-        setattr(self, field_name, compressed_file)
+    def _get_decode_bounds(self, config: dict, keep_original: bool):
+        # Если нужно только превью, полный размер не декодируем
+        if keep_original and not config.get("webp_field"):
+            return self.admin_thumb_size
+        return self._get_bounds(config)
+
+    def _save_compressed(self, img, field_name, field, config, keep_original):
+        quality = config.get("quality", self.default_quality)
+        webp_field = config.get("webp_field")
+        admin_thumb_field = config.get("admin_thumb_field")
 
-    def compress_images(self):
+        original_name = Path(field.name).stem
+        updated = []
+
+        if not keep_original or webp_field:
+            img.thumbnail(self._get_bounds(config))
+
+        if not keep_original:
+            setattr(self, field_name, self._build_image_file(
+                field_name,
+                f"{original_name}.jpg",
+                "image/jpeg",
+                lambda stream: self._save_jpeg(img, stream, quality)
+            ))
+            updated.append(field_name)
+
+        # WebP-копия того же размера для <picture>: легче JPEG
+        if webp_field:
+            setattr(self, webp_field, self._build_image_file(
+                webp_field,
+                f"{original_name}.webp",
+                "image/webp",
+                lambda stream: self._save_webp(img, stream, quality)
+            ))
+            updated.append(webp_field)
+
+        # Превью в админке: небольшой файл вместо полноразмерного
+        if admin_thumb_field:
+            img.thumbnail(self.admin_thumb_size)
+            setattr(self, admin_thumb_field, self._build_image_file(
+                admin_thumb_field,
+                f"{original_name}.jpg",
+                "image/jpeg",
+                lambda stream: self._save_jpeg(
+                    img, stream, self.admin_thumb_quality
+                )
+            ))
+            updated.append(admin_thumb_field)
+
+        return updated
+
+    def _compress_image_group(self, entries):
+        """
+        Сжимает поля с одинаковым исходным файлом,
+        декодируя его один раз
+        """
+        fields = [getattr(self, field_name) for field_name, config in entries]
+        updated = []
+
+        # Декодер PIL и исходные файлы освобождаем сразу, не дожидаясь GC
+        try:
+            with Image.open(fields[0]) as img:
+                targets = []
+                for (field_name, config), field in zip(entries, fields):
+                    max_width, max_height = self._get_bounds(config)
+                    max_file_size = config.get(
+                        "max_file_size", self.default_max_file_size
+                    )
+
+                    # Уже подходящий JPEG оставляем как есть: повторное
+                    # декодирование и кодирование ничего не даст
+                    keep_original = not config.get("compress", True) or (
+                        img.format == "JPEG"
+                        and img.width <= max_width
+                        and img.height <= max_height
+                        and field.size < max_file_size
+                    )
+                    has_variants = any(
+                        config.get(key) for key in self.variant_config_keys
+                    )
+                    if keep_original and not has_variants:
+                        continue
+                    targets.append((field_name, field, config, keep_original))
+
+                if not targets:
+                    return []
+
+                # Для JPEG libjpeg сразу декодирует в уменьшенном масштабе
+                # (1/2, 1/4, 1/8) через DCT, без полного декодирования;
+                # масштаб подбираем под самый крупный из размеров, запас
+                # x2 оставляем для качественного сглаживания
+                if img.format == "JPEG":
+                    bounds = [
+                        self._get_decode_bounds(config, keep_original)
+                        for field_name, field, config, keep_original in targets
+                    ]
+                    max_width = max(width for width, height in bounds)
+                    max_height = max(height for width, height in bounds)
+                    img.draft("RGB", (max_width * 2, max_height * 2))
+
+                if img.mode not in ("RGB", "L"):
+                    img = self._to_rgb(img)
+
+                for field_name, field, config, keep_original in targets:
+                    # thumbnail() уменьшает изображение на месте, поэтому
+                    # для нескольких полей работаем с копиями
+                    target = img.copy() if len(targets) > 1 else img
+                    updated += self._save_compressed(
+                        target, field_name, field, config, keep_original
+                    )
+        finally:
+            for field in fields:
+                field.close()
+
+        return updated
+
+    def compress_images(self, field_names=None):
+        """
+        Сжимает указанные поля (по умолчанию все из конфига)
+        и возвращает имена полей, файлы которых были заменены
+        """
+        pending = []
+        for field_name, config in self.image_compression_config.items():
+            if field_names is not None and field_name not in field_names:
+                continue
+            field = getattr(self, field_name, None)
+            if not field or getattr(field.file, "_compressed", False):
+                continue
+            pending.append((field_name, config))
+
+        compressed = []
+        for entries in self._group_by_source(pending):
+            compressed += self._compress_image_group(entries)
+        return compressed
+
+    def _get_uncompressed_fields(self):
+        # Новые загрузки, которые ещё не попали в хранилище
+        # и не являются результатом сжатия
+        field_names = []
+        for field_name in self.image_compression_config:
+            field = getattr(self, field_name, None)
+            if not field or field._committed:
+                continue
+            if getattr(field.file, "_compressed", False):
+                continue
+            field_names.append(field_name)
+        return field_names
+
+    def _clear_stale_variants(self, field_names):
+        # WebP-копия и превью устаревают, когда исходное изображение
+        # заменили или убрали; новые появятся после сжатия
         for field_name, config in self.image_compression_config.items():
-            self._compress_image_field(field_name, config)
+            if field_name in field_names or not getattr(self, field_name):
+                for key in self.variant_config_keys:
+                    if config.get(key):
+                        setattr(self, config[key], None)
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.compress_images()
-        super().save(update_fields=list(self.image_compression_config.keys()))
-
-
-class SiteSettings(models.Model, ImageCompressionMixin):
-
-    logo = models.ImageField("Логотип", upload_to=upload_to, blank=True, null=True)  # noqa
+        field_names = self._get_uncompressed_fields()
+        self._clear_stale_variants(field_names)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            # Сжатие занимает секунды, поэтому выполняется в фоне
+            # после фиксации транзакции, не задерживая ответ админки
+            # и не удерживая транзакцию на время записи в хранилище.
+            # Если сохранение откатится, задача не будет поставлена;
+            # ошибка постановки задачи не ломает уже сохранённый объект
+            if field_names:
+                transaction.on_commit(
+                    lambda: tasks.delay_compress_model_images(
+                        self._meta.app_label,
+                        self._meta.model_name,
+                        self.pk,
+                        field_names
+                    ),
+                    robust=True
+                )
+
+
+class SiteSettings(ImageCompressionMixin, models.Model):
+
+    logo = models.ImageField("Логотип", upload_to=upload_to("logo"), blank=True, null=True)  # noqa
+    logo_admin_thumb = models.ImageField(
+        "Логотип (превью)",
+        upload_to=upload_to("logo_admin_thumb"),
+        blank=True,
+        null=True,
+        editable=False
+    )
     slogan = models.CharField("Слоган", max_length=255, blank=True)
     copyright_text = models.CharField("Текст копирайт", max_length=255, blank=True)  # noqa
-    tursab_image = models.ImageField("Изображение Турсаб", upload_to=upload_to, blank=True, null=True)  # noqa
+    tursab_image = models.ImageField("Изображение Турсаб", upload_to=upload_to("tursab_image"), blank=True, null=True)  # noqa
+    tursab_image_admin_thumb = models.ImageField(
+        "Турсаб (превью)",
+        upload_to=upload_to("tursab_image_admin_thumb"),
+        blank=True,
+        null=True,
+        editable=False
+    )
 
     address = models.CharField("Адрес", max_length=255, blank=True)
     address_gmap = models.TextField("Ссылка Google-карт", blank=True)
@@ -123,16 +407,43 @@ class SiteSettings(models.Model, ImageCompressionMixin):
     banner_link = models.URLField("Ссылка баннера", blank=True)
     banner_image = models.ImageField(
         "Изображение баннера",
-        upload_to=upload_to,
+        upload_to=upload_to("banner_image"),
         blank=True,
         null=True
     )
+    banner_image_webp = models.ImageField(
+        "Изображение баннера (WebP)",
+        upload_to=upload_to("banner_image_webp"),
+        blank=True,
+        null=True,
+        editable=False
+    )
+
+    updated_at = models.DateTimeField("Обновлено", auto_now=True)
+    # Последнее изменение контента страниц (экскурсии, отзывы, FAQ,
+    # соцсети); обновляется сигналами, используется для Last-Modified
+    content_updated_at = models.DateTimeField(
+        "Контент обновлён",
+        default=timezone.now,
+        editable=False
+    )
 
     image_compression_config = {
-        "banner": {
+        # логотип и Турсаб могут быть PNG с прозрачностью,
+        # поэтому для них создаются только превью
+        "logo": {
+            "compress": False,
+            "admin_thumb_field": "logo_admin_thumb"
+        },
+        "tursab_image": {
+            "compress": False,
+            "admin_thumb_field": "tursab_image_admin_thumb"
+        },
+        "banner_image": {
             "max_width": 1080,
             "max_height": 520,
-            "quality": 75
+            "quality": 75,
+            "webp_field": "banner_image_webp"
         }
     }
 
@@ -158,6 +469,34 @@ class SiteSettings(models.Model, ImageCompressionMixin):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def touch_content(cls):
+        cls.objects.filter(pk=1).update(content_updated_at=timezone.now())
+
+    @classmethod
+    def get_last_modified(cls):
+        # Читаем из БД, а не из кэша: без общего кэша у каждого процесса
+        # свой LocMemCache, и изменение, сделанное в другом процессе,
+        # осталось бы незамеченным
+        timestamps = (
+            cls.objects
+            .filter(pk=1)
+            .values_list("updated_at", "content_updated_at")
+            .first()
+        )
+        return max(timestamps) if timestamps else None
+
+    @classmethod
+    def get_cached(cls, version=None):
+        if version is None:
+            version = get_cache_version(cls.get_last_modified())
+        return cache.get_or_set(
+            SITE_SETTINGS_CACHE_KEY,
+            cls.load,
+            SITE_SETTINGS_CACHE_TIMEOUT,
+            version=version
+        )
+
 
 class Excursion(
     ImageCompressionMixin,
@@ -172,18 +511,35 @@ class Excursion(
     created_at = models.DateTimeField("Создано", auto_now_add=True)  # noqa
     updated_at = models.DateTimeField("Обновлено", auto_now=True)  # noqa
 
-    cover = models.ImageField("Изображение (обложка)", upload_to=upload_to, blank=True, null=True)  # noqa
-    cover_head = models.ImageField("Шапка", upload_to=upload_to, blank=True, null=True)  # noqa
+    cover = models.ImageField("Изображение (обложка)", upload_to=upload_to("cover"), blank=True, null=True)  # noqa
+    cover_head = models.ImageField("Шапка", upload_to=upload_to("cover_head"), blank=True, null=True)  # noqa
+    cover_admin_thumb = models.ImageField(
+        "Обложка (превью)",
+        upload_to=upload_to("cover_admin_thumb"),
+        blank=True,
+        null=True,
+        editable=False
+    )
+    cover_head_admin_thumb = models.ImageField(
+        "Шапка (превью)",
+        upload_to=upload_to("cover_head_admin_thumb"),
+        blank=True,
+        null=True,
+        editable=False
+    )
+
     image_compression_config = {
         "cover": {
             "max_width": 1280,
             "max_height": 1280,
-            "quality": 75
+            "quality": 75,
+            "admin_thumb_field": "cover_admin_thumb"
         },
         "cover_head": {
             "max_width": 1280,
             "max_height": 1280,
-            "quality": 75
+            "quality": 75,
+            "admin_thumb_field": "cover_head_admin_thumb"
         }
     }
 
@@ -191,6 +547,9 @@ class Excursion(
         verbose_name = "Экскурсия"
         verbose_name_plural = "Экскурсии"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["is_published", "-created_at"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -212,12 +571,21 @@ class ExcursionImage(
     caption = models.CharField("Подпись", max_length=200, blank=True)
     sort_order = models.PositiveIntegerField("Порядок", default=0)
 
-    image = models.ImageField("Изображение", upload_to=upload_to)
+    image = models.ImageField("Изображение", upload_to=upload_to("image"))
+    image_admin_thumb = models.ImageField(
+        "Изображение (превью)",
+        upload_to=upload_to("image_admin_thumb"),
+        blank=True,
+        null=True,
+        editable=False
+    )
+
     image_compression_config = {
         "image": {
             "max_width": 1280,
             "max_height": 1280,
-            "quality": 75
+            "quality": 75,
+            "admin_thumb_field": "image_admin_thumb"
         }
     }
 
@@ -230,17 +598,37 @@ class ExcursionImage(
         return f"{self.excursion} — #{self.pk}"
 
 
-class Review(models.Model):
-    photo = models.ImageField("Фото", upload_to=upload_to, blank=True, null=True)  # noqa
+class Review(
+    ImageCompressionMixin,
+    models.Model
+):
+    photo = models.ImageField("Фото", upload_to=upload_to("photo"), blank=True, null=True)  # noqa
+    photo_admin_thumb = models.ImageField(
+        "Фото (превью)",
+        upload_to=upload_to("photo_admin_thumb"),
+        blank=True,
+        null=True,
+        editable=False
+    )
     full_name = models.CharField("Полное имя", max_length=150)
     text = models.TextField("Текст")
     is_published = models.BooleanField("Опубликовано", default=True)
     created_at = models.DateTimeField("Создано", auto_now_add=True)
 
+    image_compression_config = {
+        "photo": {
+            "compress": False,
+            "admin_thumb_field": "photo_admin_thumb"
+        }
+    }
+
     class Meta:
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["is_published", "-created_at"]),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -256,6 +644,9 @@ class FAQ(models.Model):
         verbose_name = "Часто задаваемый вопрос"
         verbose_name_plural = "Часто задаваемые вопросы"
         ordering = ("sort_order", "id")
+        indexes = [
+            models.Index(fields=["is_published", "sort_order"]),
+        ]
 
     def __str__(self):
         return self.question
@@ -272,6 +663,9 @@ class SocialLink(models.Model):
         verbose_name = "Соцсеть"
         verbose_name_plural = "Соцсети"
         ordering = ("sort_order", "id")
+        indexes = [
+            models.Index(fields=["is_active", "sort_order"]),
+        ]
 
     def __str__(self):
         return self.title or self.url
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import models
+
+
+@receiver((post_save, post_delete), sender=models.Excursion)
+@receiver((post_save, post_delete), sender=models.ExcursionImage)
+@receiver((post_save, post_delete), sender=models.Review)
+@receiver((post_save, post_delete), sender=models.FAQ)
+@receiver((post_save, post_delete), sender=models.SocialLink)
+@receiver((post_save, post_delete), sender=models.SiteSettings)
+def touch_content(**kwargs):
+    # Новое время изменения меняет и версию кэша списков и настроек
+    transaction.on_commit(models.SiteSettings.touch_content)
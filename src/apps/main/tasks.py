@@ -0,0 +1,73 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.db import connection, models
+
+
+logger = logging.getLogger(__name__)
+
+# Брокера задач в проекте нет, поэтому фоновые задачи выполняются
+# в отдельном потоке процесса. Один поток: сжатие нагружает CPU,
+# и параллельные задачи конкурировали бы с обработкой запросов
+_executor = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="main-tasks",
+)
+
+
+def compress_model_images(app_label, model_name, pk, field_names):
+    """
+    Сжимает изображения сохранённого объекта и удаляет исходные файлы
+    """
+    model = apps.get_model(app_label, model_name)
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None:
+        return
+
+    # Сжатие может заменить и соседние поля (например, WebP-копию),
+    # поэтому запоминаем имена всех файлов объекта
+    original_names = {
+        field.name: getattr(obj, field.name).name
+        for field in model._meta.fields
+        if isinstance(field, models.FileField)
+    }
+
+    compressed = obj.compress_images(field_names)
+    if not compressed:
+        return
+
+    # auto_now-поля (updated_at) тоже сохраняем: по ним строится
+    # Last-Modified, а исходные файлы ниже удаляются
+    auto_now_fields = [
+        field.name
+        for field in model._meta.fields
+        if getattr(field, "auto_now", False)
+    ]
+    obj.save(update_fields=compressed + auto_now_fields)
+
+    for field_name in compressed:
+        field = getattr(obj, field_name)
+        original_name = original_names[field_name]
+        if original_name and original_name != field.name:
+            field.storage.delete(original_name)
+
+
+def _run(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background task %s failed", func.__name__)
+    finally:
+        connection.close()
+
+
+def delay_compress_model_images(app_label, model_name, pk, field_names):
+    _executor.submit(
+        _run,
+        compress_model_images,
+        app_label,
+        model_name,
+        pk,
+        field_names,
+    )
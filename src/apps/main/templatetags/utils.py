@@ -1,40 +1,78 @@
 from django import template
+from django.core.cache import cache
+
 from .. import models
 
 
 register = template.Library()
 
 
-@register.simple_tag
-def get_site_settings():
-    return models.SiteSettings.load()
-
-
-@register.simple_tag
-def get_excursion_list():
-    return models.Excursion.objects.all()
-
-
-@register.simple_tag
-def get_review_list():
-    return models.Review.objects.all()
-
-
-@register.simple_tag
-def get_faq_list():
-    return models.FAQ.objects.all()
+@register.simple_tag(takes_context=True)
+def get_site_settings(context):
+    # Шапка, подвал и блоки страницы берут настройки из запроса,
+    # чтобы не обращаться к кэшу при каждом вызове тега
+    request = context.get("request")
+    site_settings = getattr(request, "site_settings", None)
+    if site_settings is None:
+        return models.SiteSettings.get_cached()
+    return site_settings
+
+
+def _get_cache_version(context):
+    # Время изменения контента берём из запроса, где оно уже прочитано
+    request = context.get("request")
+    get_updated_at = getattr(
+        request,
+        "get_content_updated_at",
+        models.SiteSettings.get_last_modified
+    )
+    return models.get_cache_version(get_updated_at())
+
+
+@register.simple_tag(takes_context=True)
+def get_excursion_list(context):
+    return cache.get_or_set(
+        models.EXCURSION_LIST_CACHE_KEY,
+        lambda: list(
+            models.Excursion.objects
+            .filter(is_published=True)
+            .defer("short_description", "content_md")
+        ),
+        models.LIST_CACHE_TIMEOUT,
+        version=_get_cache_version(context)
+    )
+
+
+@register.simple_tag(takes_context=True)
+def get_review_list(context):
+    return cache.get_or_set(
+        models.REVIEW_LIST_CACHE_KEY,
+        lambda: list(models.Review.objects.filter(is_published=True)),
+        models.LIST_CACHE_TIMEOUT,
+        version=_get_cache_version(context)
+    )
+
+
+@register.simple_tag(takes_context=True)
+def get_faq_list(context):
+    return cache.get_or_set(
+        models.FAQ_LIST_CACHE_KEY,
+        lambda: list(models.FAQ.objects.filter(is_published=True)),
+        models.LIST_CACHE_TIMEOUT,
+        version=_get_cache_version(context)
+    )
 
 
 @register.simple_tag
 def get_social_link_list():
-    return models.SocialLink.objects.all()
+    return models.SocialLink.objects.filter(is_active=True)
 
 
 @register.filter
 def index(list_obj, i):
     try:
         return list_obj[int(i)]
-    finally:
+    except (IndexError, KeyError, TypeError, ValueError):
         return ""
 
 
@@ -1,26 +1,64 @@
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
 from . import models
 
 
+# Время запуска процесса: после выкладки шаблонов или статики
+# страницы должны отдаться заново, а не ответом 304
+STARTED_AT = timezone.now()
+
+
+def last_modified(request, *args, **kwargs):
+    # Все страницы выводят настройки сайта и контент из админки.
+    # Время изменения уже могло быть прочитано за этот запрос
+    get_updated_at = getattr(
+        request,
+        "get_content_updated_at",
+        models.SiteSettings.get_last_modified
+    )
+    updated_at = max(filter(None, (get_updated_at(), STARTED_AT)))
+
+    # Last-Modified передаётся с точностью до секунды: изменение в ту же
+    # секунду (например, завершение фонового сжатия) было бы неотличимо,
+    # поэтому до её окончания заголовок не отдаём
+    if int(updated_at.timestamp()) >= int(timezone.now().timestamp()):
+        return None
+    return updated_at
+
+
+conditional = method_decorator(
+    condition(last_modified_func=last_modified),
+    name='dispatch'
+)
+
+
+@conditional
 class HomeView(generic.TemplateView):
     template_name = 'main/home/index.django-html'
 
 
+@conditional
 class AboutUsView(generic.TemplateView):
     template_name = 'main/about-us.django-html'
 
 
+@conditional
 class ContactUsView(generic.TemplateView):
     template_name = 'main/contact-us.django-html'
 
 
+@conditional
 class ExcursionListView(generic.ListView):
     model = models.Excursion
+    queryset = models.Excursion.objects.defer('short_description', 'content_md')  # noqa
     template_name = 'main/excursion-list.django-html'
     ordering = ('created_at')
 
 
+@conditional
 class ExcursionDetailView(generic.DetailView):
     model = models.Excursion
     template_name = 'main/excursion-detail/index.django-html'